@@ -2,93 +2,450 @@
 
 import warnings
 import argparse
-import json
+import contextlib
+import importlib.util
 import os
+import random
 import tempfile
 import zipfile
-from pathlib import Path
-from datetime import datetime, timezone
+from datetime import datetime
+import hashlib
+import shutil
+import sqlite3
+import sys
 import subprocess
+import multiprocessing
+import threading
+import time
+import wave
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import numpy as np
+import orjson
+import requests
+
+# Let the CUDA caching allocator grow segments instead of fragmenting, so
+# memory is reused across files without flushing the cache.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+import torch
 import whisper
 from pyannote.audio import Pipeline
 from halo import Halo
+from huggingface_hub import constants as hub_constants
+from huggingface_hub.utils import LocalEntryNotFoundError
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
 from zipfile import BadZipFile 
 
 SPINNER_TYPE = "pong"
 SPINNER_COLOR = "red"
+# Spinners only make sense on a terminal; piped or logged output gets no ANSI redraws.
+# BLABBERFISH_QUIET=1 turns them off on a terminal too; status lines are still printed.
+SHOW_SPINNERS = sys.stdout.isatty() and os.environ.get("BLABBERFISH_QUIET", "") in ("", "0")
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# Hugging Face Hub responses worth retrying when downloading models.
+TRANSIENT_HTTP_STATUS = (429, 500, 502, 503, 504)
+# Files decoded concurrently ahead of the GPU stages. Each holds a full waveform
+# in memory, so this stays small even on many-core machines.
+DECODE_AHEAD = min(4, max(1, (os.cpu_count() or 2) // 2))
+# Largest transcript x speaker overlap matrix aligned with NumPy. Alignment holds two
+# float64 matrices of this size at its peak, capping it at ~80 MB; longer recordings
+# fall back to the sort-and-sweep.
+ALIGN_MATRIX_LIMIT = 5_000_000
+
+
+# Worker processes leave status reporting to the parent, so they print nothing.
+SHOW_STATUS = True
+
+
+class PlainStatus:
+    """Stand-in for a Halo spinner off a terminal: no animation, but the final status line is still printed."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def _print(self, text):
+        if self.enabled:
+            print(text, flush=True)
+        return self
+
+    def succeed(self, text=None):
+        return self._print(text)
+
+    def fail(self, text=None):
+        return self._print(text)
+
+
+def start_spinner(text, enabled=True):
+    """Start a Halo spinner. enabled=False silences it entirely; with spinners off, only its outcome is printed."""
+    if SHOW_SPINNERS and SHOW_STATUS:
+        return Halo(text=text, spinner=SPINNER_TYPE, color=SPINNER_COLOR, enabled=enabled).start()
+    # Halo's succeed()/fail() print nothing when disabled, which would hide fatal errors.
+    return PlainStatus(enabled and SHOW_STATUS)
+
+
+ZipEntry = namedtuple("ZipEntry", ["zip_path", "name"])
 
 
-def extract_zip(zip_path, extract_to):
-    """Extract all mp3/mp4 files from a zip archive into a temporary directory."""
+def list_zip_media(zip_path):
+    """List the mp3/mp4/wav entries of a zip archive without extracting them."""
     try:
         with zipfile.ZipFile(zip_path, "r") as z:
-            z.extractall(extract_to)
-        return [
-            str(p)
-            for p in Path(extract_to).rglob("*")
-            if p.suffix.lower() in (".mp3", ".mp4")
-        ]
+            return [
+                ZipEntry(zip_path, info.filename)
+                for info in z.infolist()
+                if not info.is_dir() and info.filename.lower().endswith((".mp3", ".mp4", ".wav"))
+            ]
     except BadZipFile as e:
         raise BadZipFile(f"File is not a valid ZIP file or is corrupted: {e}")
 
 
-def convert_to_wav(input_file, tmpdir):
-    """Convert mp3/mp4 to wav using ffmpeg (for pyannote compatibility)."""
-    filename = os.path.basename(input_file)
-    output_file = os.path.join(
-        tmpdir, os.path.splitext(filename)[0] + ".wav"
-    )
-    
-    spinner = Halo(
-        text=f"Converting {filename} to WAV (16kHz, mono)...", 
-        spinner=SPINNER_TYPE, 
-        color=SPINNER_COLOR
-    ).start()
-    
+def source_name(source):
+    """Return the display filename of a media path or ZipEntry."""
+    if isinstance(source, ZipEntry):
+        return source.name.rsplit("/", 1)[-1]
+    return os.path.basename(source)
+
+
+def _feed_stdin(src, proc, errors):
+    """Copy a file object into ffmpeg's stdin, stopping quietly if ffmpeg exits early.
+
+    Read errors (e.g. a bad CRC in a zip entry) are appended to errors for the caller to raise.
+    """
     try:
-        subprocess.run(
-            ["ffmpeg", "-y", "-i", input_file, "-ar", "16000", "-ac", "1", output_file],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        spinner.succeed("Conversion complete.")
-        return output_file
+        shutil.copyfileobj(src, proc.stdin, length=1 << 20)
+    except BrokenPipeError:
+        pass
+    except Exception as e:
+        errors.append(e)
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def _run_ffmpeg(input_arg, src=None):
+    """Run ffmpeg on a path, or on pipe:0 fed from src, returning 16kHz mono float PCM."""
+    cmd = ["ffmpeg", "-nostdin", "-i", input_arg, "-f", "s16le", "-ac", "1", "-ar", "16000", "-"]
+    if src is not None:
+        cmd.remove("-nostdin")
+    with subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if src is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=1 << 20,
+    ) as proc:
+        # stdin is fed from a thread so ffmpeg never blocks on a full stdout pipe.
+        feeder = None
+        feed_errors = []
+        if src is not None:
+            feeder = threading.Thread(target=_feed_stdin, args=(src, proc, feed_errors))
+            feeder.start()
+        pcm = proc.stdout.read()
+        if feeder is not None:
+            feeder.join()
+    # ffmpeg exits cleanly on a truncated stream, so a failed read must not pass for a full decode.
+    if feed_errors:
+        raise feed_errors[0]
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def _read_wav_16k(f):
+    """Read a 16kHz mono 16-bit PCM WAV from a path or file object without ffmpeg. Returns None for any other file."""
+    try:
+        with wave.open(f, "rb") as w:
+            if (w.getframerate(), w.getnchannels(), w.getsampwidth()) != (16000, 1, 2):
+                return None
+            frames = w.getnframes()
+            pcm = w.readframes(frames)
+    except (wave.Error, EOFError, OSError):
+        # Unreadable or missing files are left to ffmpeg, which reports the failure.
+        return None
+    # Streaming recorders can leave a zero or stale data size in the header, and a
+    # truncated file can end mid-sample; ffmpeg recovers the audio from those.
+    if frames == 0 or len(pcm) != frames * 2:
+        return None
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def _run_zip_ffmpeg(z, name):
+    """Decode one zip entry with ffmpeg, streaming it through stdin or a temporary file for MP4."""
+    with z.open(name) as member:
+        if name.lower().endswith(".mp4"):
+            with tempfile.NamedTemporaryFile(suffix=".mp4") as spool:
+                shutil.copyfileobj(member, spool, length=1 << 20)
+                spool.flush()
+                return _run_ffmpeg(spool.name)
+        return _run_ffmpeg("pipe:0", member)
+
+
+def read_pcm(source):
+    """Decode mp3/mp4/wav to a 16kHz mono waveform by piping ffmpeg's raw PCM output into memory.
+
+    Zip entries are streamed from the archive into ffmpeg's stdin. MP4 entries are
+    spooled to a temporary file first, because the MP4 index can sit at the end of
+    the file and ffmpeg cannot seek in a pipe. WAVs already in the target format
+    are read directly.
+    """
+    is_wav = source_name(source).lower().endswith(".wav")
+    if isinstance(source, ZipEntry):
+        with zipfile.ZipFile(source.zip_path, "r") as z:
+            audio = None
+            if is_wav:
+                with z.open(source.name) as member:
+                    audio = _read_wav_16k(member)
+            if audio is None:
+                audio = _run_zip_ffmpeg(z, source.name)
+    else:
+        # Audio that is already in the target format needs no ffmpeg decode/resample pass.
+        audio = _read_wav_16k(source) if is_wav else None
+        if audio is None:
+            audio = _run_ffmpeg(source)
+    return torch.from_numpy(audio).unsqueeze(0)
+
+
+def decode_audio(filename, decoding):
+    """Wait for a background read_pcm of filename to finish. Returns the waveform."""
+
+    spinner = start_spinner(f"Decoding {filename} to PCM (16kHz, mono)...")
+
+    try:
+        waveform = decoding.result()
+        spinner.succeed("Decoding complete.")
+        return waveform
     except subprocess.CalledProcessError as e:
         spinner.fail(f"FFmpeg conversion failed for {filename}.")
         raise e
     except FileNotFoundError:
         spinner.fail(f"FFmpeg not found. Please ensure it is installed and in your PATH.")
         raise
+    except Exception as e:
+        spinner.fail(f"Decoding failed for {filename}.")
+        raise e
+
+
+def is_transient_hub_error(error):
+    """Whether a model-loading error was caused by a network failure or a 429/5xx Hub response."""
+    # huggingface_hub re-raises request failures as LocalEntryNotFoundError, and
+    # transformers wraps those in OSError, so the original error sits further down the chain.
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        cause = error.__cause__ or error.__context__
+        # LocalEntryNotFoundError is itself an HTTPError without a response, so only its cause counts.
+        if isinstance(error, LocalEntryNotFoundError):
+            pass
+        elif isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        elif isinstance(error, requests.HTTPError):
+            return getattr(error.response, "status_code", None) in TRANSIENT_HTTP_STATUS
+        error = cause
+    return False
+
+
+def is_cache_only_miss(error):
+    """Whether error is a bare "not in the local cache" with the Hub error that caused it discarded."""
+    # faster-whisper swallows the Hub error and retries from the local cache only, so this
+    # is all that is left of a failed download, whether it was a network error or a bad repo id.
+    return (
+        isinstance(error, LocalEntryNotFoundError)
+        and error.__cause__ is None
+        and error.__context__ is None
+        and not hub_constants.HF_HUB_OFFLINE
+    )
+
+
+def retry_hub_download(load, attempts=5):
+    """Call a Hugging Face Hub loader, retrying transient network errors with jittered exponential backoff."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return load()
+        except Exception as e:
+            if is_transient_hub_error(e):
+                limit = attempts
+            elif is_cache_only_miss(e):
+                # The cause is unknown and may be permanent, so it gets a single retry.
+                limit = min(2, attempts)
+            else:
+                raise
+            if attempt >= limit:
+                raise
+            # A cold or rate-limited Hub answers 429/503; several --workers loading at once can trigger it.
+            time.sleep(min(60, 2 ** attempt) + random.uniform(0, 1))
+
+
+def load_whisper_model(name, backend, compile_model=False, device=DEVICE, compute_type=None):
+    """Load a Whisper model for the chosen backend, optionally compiled with torch.compile."""
+    if backend == "faster-whisper":
+        from faster_whisper import WhisperModel
+
+        device = torch.device(device)
+        if compute_type is None:
+            # int8 weights roughly quarter VRAM use and run on INT8 tensor cores.
+            compute_type = "int8_float16" if device.type == "cuda" else "int8"
+        return retry_hub_download(
+            lambda: WhisperModel(
+                name, device=device.type, device_index=device.index or 0, compute_type=compute_type
+            )
+        )
+
+    if backend == "transformers":
+        from transformers import pipeline
+
+        device = torch.device(device)
+        if device.type != "cuda":
+            dtype = torch.float32
+        elif torch.cuda.is_bf16_supported():
+            dtype = torch.bfloat16
+        else:
+            dtype = torch.float16
+        # Flash Attention 2 needs the optional flash-attn package; SDPA is the built-in fallback.
+        attention = "flash_attention_2" if device.type == "cuda" and importlib.util.find_spec("flash_attn") else "sdpa"
+        return retry_hub_download(
+            lambda: pipeline(
+                "automatic-speech-recognition",
+                model=name if "/" in name else f"openai/whisper-{name}",
+                torch_dtype=dtype,
+                device=device,
+                model_kwargs={"attn_implementation": attention},
+            )
+        )
 
+    model = whisper.load_model(name, device=device)
+    if compile_model:
+        torch.set_float32_matmul_precision("high")
+        model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+        model.decoder = torch.compile(model.decoder, mode="reduce-overhead")
+        # Pay the one-off compilation cost here rather than on the first file.
+        model.transcribe(
+            np.zeros(whisper.audio.N_SAMPLES, dtype=np.float32),
+            verbose=None,
+            fp16=model.device.type == "cuda",
+        )
+    return model
+
+
+def load_diarization_pipeline(token, device=DEVICE):
+    """Load the Pyannote speaker diarization pipeline onto a device."""
+    pipeline = retry_hub_download(
+        lambda: Pipeline.from_pretrained("pyannote/speaker-diarization", use_auth_token=token)
+    )
+    return pipeline.to(torch.device(device))
 
-def transcribe_with_whisper(audio_file, model):
-    """Transcribe audio file using Whisper (local). Returns structured segments."""
-    spinner = Halo(
-        text=f"Transcribing {os.path.basename(audio_file)} using Whisper...", 
-        spinner=SPINNER_TYPE, 
-        color=SPINNER_COLOR
-    ).start()
+
+def transcribe_with_whisper(filename, waveform, model, batch_size=0, language=None, show_spinner=True):
+    """Transcribe a decoded waveform using Whisper (local). Returns structured segments."""
+    spinner = start_spinner(f"Transcribing {filename} using Whisper...", show_spinner)
     
     try:
-        result = model.transcribe(audio_file, verbose=False, fp16=False) 
+        audio = waveform.squeeze(0).numpy()
+        if isinstance(model, whisper.Whisper):
+            result = model.transcribe(
+                audio, verbose=False, fp16=model.device.type == "cuda", language=language
+            )
+            spinner.succeed("Transcription complete.")
+            return result.get("segments", [])
+
+        if type(model).__module__.startswith("transformers"):
+            result = model(
+                {"raw": audio, "sampling_rate": whisper.audio.SAMPLE_RATE},
+                chunk_length_s=30,
+                batch_size=batch_size or 24,
+                return_timestamps=True,
+                generate_kwargs={"language": language} if language else {},
+            )
+            duration = len(audio) / whisper.audio.SAMPLE_RATE
+            segments = [
+                {
+                    "start": c["timestamp"][0],
+                    # The last chunk's end is None when the audio is cut mid-segment.
+                    "end": c["timestamp"][1] if c["timestamp"][1] is not None else duration,
+                    "text": c["text"],
+                }
+                for c in result["chunks"]
+            ]
+            spinner.succeed("Transcription complete.")
+            return segments
+
+        if batch_size:
+            from faster_whisper import BatchedInferencePipeline
+
+            segments, _ = BatchedInferencePipeline(model).transcribe(
+                audio, language=language, beam_size=5, vad_filter=True, batch_size=batch_size
+            )
+        else:
+            segments, _ = model.transcribe(audio, language=language, beam_size=5, vad_filter=True)
+        # faster-whisper yields segments lazily; decoding happens while iterating.
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        spinner.succeed("Transcription complete.")
+        return segments
+    except Exception as e:
+        spinner.fail(f"Transcription failed for {filename}.")
+        raise e
+
+
+def transcribe_turns(filename, waveform, speaker_segments, model, batch_size, language=None):
+    """Transcribe diarized speaker turns with batched Whisper decoding. Returns conversation entries."""
+    spinner = start_spinner(f"Transcribing {len(speaker_segments)} speaker turns of {filename} using Whisper...")
+
+    try:
+        audio = waveform.squeeze(0)
+
+        # Whisper's encoder only accepts 30 s windows, so longer turns are split.
+        chunks = []
+        for s in speaker_segments:
+            start = int(s["start"] * whisper.audio.SAMPLE_RATE)
+            end = int(s["end"] * whisper.audio.SAMPLE_RATE)
+            for offset in range(start, end, whisper.audio.N_SAMPLES):
+                chunks.append((s["speaker"], offset, min(offset + whisper.audio.N_SAMPLES, end)))
+
+        options = whisper.DecodingOptions(
+            fp16=model.device.type == "cuda", language=language, without_timestamps=True
+        )
+        conversation = []
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(audio[start:end]), model.dims.n_mels
+                )
+                for _, start, end in batch
+            ]).to(model.device)
+            results = whisper.decode(model, mels, options)
+            for (speaker, start, end), result in zip(batch, results):
+                conversation.append(
+                    {
+                        "speaker": speaker,
+                        "start": start / whisper.audio.SAMPLE_RATE,
+                        "end": end / whisper.audio.SAMPLE_RATE,
+                        "text": result.text.strip(),
+                    }
+                )
+
         spinner.succeed("Transcription complete.")
-        return result.get("segments", [])
+        return merge_adjacent_segments([c for c in conversation if c["text"]])
     except Exception as e:
-        spinner.fail(f"Transcription failed for {os.path.basename(audio_file)}.")
+        spinner.fail(f"Transcription failed for {filename}.")
         raise e
 
 
-def diarize_with_pyannote(audio_file, diarization_pipeline):
-    """Run speaker diarization on audio file. Returns speaker segments."""
-    spinner = Halo(
-        text=f"Running speaker diarization on {os.path.basename(audio_file)} using Pyannote...", 
-        spinner=SPINNER_TYPE, 
-        color=SPINNER_COLOR
-    ).start()
+def diarize_with_pyannote(filename, waveform, diarization_pipeline, show_spinner=True):
+    """Run speaker diarization on a decoded waveform. Returns speaker segments."""
+    spinner = start_spinner(f"Running speaker diarization on {filename} using Pyannote...", show_spinner)
     
     try:
-        diarization = diarization_pipeline(audio_file)
+        diarization = diarization_pipeline(
+            {"waveform": waveform, "sample_rate": whisper.audio.SAMPLE_RATE}
+        )
         speaker_segments = []
         for turn, _, speaker in diarization.itertracks(yield_label=True):
             speaker_segments.append(
@@ -97,33 +454,75 @@ def diarize_with_pyannote(audio_file, diarization_pipeline):
         spinner.succeed("Diarization complete.")
         return speaker_segments
     except Exception as e:
-        spinner.fail(f"Diarization failed for {os.path.basename(audio_file)}.")
+        spinner.fail(f"Diarization failed for {filename}.")
         raise e
 
 
+def _best_speakers_vectorized(transcript_segments, speaker_segments):
+    """Pick each transcript segment's most-overlapping speaker from a (T, S) NumPy overlap matrix."""
+    t_start = np.array([t["start"] for t in transcript_segments])[:, None]
+    t_end = np.array([t["end"] for t in transcript_segments])[:, None]
+    s_start = np.array([s["start"] for s in speaker_segments])[None, :]
+    s_end = np.array([s["end"] for s in speaker_segments])[None, :]
+    s_speaker = np.array([s["speaker"] for s in speaker_segments] + [None], dtype=object)
+
+    # Work in place so no more than two (T, S) matrices are alive at once.
+    overlap = np.minimum(t_end, s_end)
+    np.subtract(overlap, np.maximum(t_start, s_start), out=overlap)
+    np.maximum(overlap, 0, out=overlap)
+    best = overlap.argmax(axis=1)
+    best[overlap.max(axis=1) <= 0] = -1
+    return s_speaker[best].tolist()
+
+
+def _best_speakers_sweep(transcript_segments, speaker_segments):
+    """Pick each transcript segment's most-overlapping speaker with a sort-and-sweep."""
+    speakers = sorted(enumerate(speaker_segments), key=lambda p: p[1]["start"])
+    order = sorted(range(len(transcript_segments)), key=lambda i: transcript_segments[i]["start"])
+
+    # Sweep both lists by start time; speaker turns that ended before the
+    # current transcript segment can never overlap a later one.
+    best_speakers = [None] * len(transcript_segments)
+    j_lo = 0
+    for i in order:
+        t = transcript_segments[i]
+        t_start, t_end = t["start"], t["end"]
+        while j_lo < len(speakers) and speakers[j_lo][1]["end"] <= t_start:
+            j_lo += 1
+
+        best_overlap = 0.0
+        best_index = len(speakers)
+        j = j_lo
+        while j < len(speakers) and speakers[j][1]["start"] < t_end:
+            index, s = speakers[j]
+            overlap = min(t_end, s["end"]) - max(t_start, s["start"])
+            # Overlapping turns can tie; the earliest turn in diarization order wins, as in the full scan.
+            if overlap > best_overlap or (overlap == best_overlap > 0 and index < best_index):
+                best_overlap = overlap
+                best_index = index
+                best_speakers[i] = s["speaker"]
+            j += 1
+    return best_speakers
+
+
 def align_transcription_with_diarization(transcript_segments, speaker_segments):
     """Align Whisper transcript segments with diarized speaker segments."""
-    aligned = []
-    for t in transcript_segments:
-        t_start, t_end, text = t["start"], t["end"], t["text"].strip()
-        best_speaker = None
-        best_overlap = 0.0
+    if not transcript_segments or not speaker_segments:
+        best_speakers = [None] * len(transcript_segments)
+    elif len(transcript_segments) * len(speaker_segments) <= ALIGN_MATRIX_LIMIT:
+        best_speakers = _best_speakers_vectorized(transcript_segments, speaker_segments)
+    else:
+        best_speakers = _best_speakers_sweep(transcript_segments, speaker_segments)
 
-        for s in speaker_segments:
-            overlap = max(0, min(t_end, s["end"]) - max(t_start, s["start"]))
-            
-            if overlap > best_overlap:
-                best_overlap = overlap
-                best_speaker = s["speaker"]
-
-        aligned.append(
-            {
-                "speaker": best_speaker if best_speaker else "unknown",
-                "start": t_start,
-                "end": t_end,
-                "text": text,
-            }
-        )
+    aligned = [
+        {
+            "speaker": best_speaker if best_speaker else "unknown",
+            "start": t["start"],
+            "end": t["end"],
+            "text": t["text"].strip(),
+        }
+        for t, best_speaker in zip(transcript_segments, best_speakers)
+    ]
     return merge_adjacent_segments(aligned)
 
 
@@ -132,75 +531,338 @@ def merge_adjacent_segments(segments):
     if not segments:
         return []
     
+    # Collect each run's text pieces and join once, instead of growing a string per segment.
     merged = [segments[0]]
+    parts = [[segments[0]["text"]]]
     for seg in segments[1:]:
         last = merged[-1]
         if seg["speaker"] == last["speaker"]:
-            last["text"] += " " + seg["text"]
+            parts[-1].append(seg["text"])
             last["end"] = seg["end"]
         else:
             merged.append(seg)
+            parts.append([seg["text"]])
+
+    for seg, texts in zip(merged, parts):
+        seg["text"] = " ".join(texts)
     return merged
 
 
-def write_single_markdown(record, output_dir="."):
+def write_single_markdown(record, timestamp, output_dir="."):
     """Write transcript as a single Markdown file based on the audio filename."""
     filename = record["file"]
     conversation = record["conversation"]
 
-    timestamp = datetime.now(timezone.utc).astimezone(datetime.now().astimezone().tzinfo).strftime("%B %d, %Y, %I:%M %p %Z")
-    
-    out_path = os.path.join(
-        output_dir, 
-        f"{os.path.splitext(filename)[0]}.md",
-    )
+    stem = os.path.splitext(filename)[0]
+    out_path = f"{output_dir}/{stem}.md"
     
-    with open(out_path, "w", encoding="utf-8") as out_f:
-        out_f.write(f"# {filename}\n\n")
-        out_f.write(f"## Conversation {timestamp}\n\n")
-        for entry in conversation:
-            out_f.write(f"**{entry['speaker']}**: {entry['text']}\n\n")
+    lines = [f"# {filename}\n\n", f"## Conversation {timestamp}\n\n"]
+    lines.extend(f"**{entry['speaker']}**: {entry['text']}\n\n" for entry in conversation)
+
+    with open(out_path, "w", encoding="utf-8", buffering=1 << 20) as out_f:
+        out_f.writelines(lines)
             
     print(f"Markdown transcript saved to {out_path}")
 
 
-def process_files(files, whisper_model, diarization_pipeline, out_path_base):
-    """Process and transcribe a list of mp3/mp4 files, writing a Markdown output per file."""
+def open_jsonl(jsonl_path):
+    """Open the JSONL output for binary writing, or return a null context when it is disabled."""
+    if not jsonl_path:
+        return contextlib.nullcontext()
+    return open(jsonl_path, "wb", buffering=1 << 20)
+
+
+def write_jsonl_record(out_f, record):
+    """Append one record to a JSONL file opened in binary mode."""
+    out_f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+
+
+class TranscriptCache:
+    """SQLite-backed LRU cache of conversations, keyed by a hash of the decoded audio and the model settings."""
+
+    def __init__(self, cache_dir, max_mb, settings):
+        os.makedirs(cache_dir, exist_ok=True)
+        # Several --workers processes may share the database, so wait on locks rather than fail.
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "transcripts.sqlite3"), timeout=60)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            "key TEXT PRIMARY KEY, conversation BLOB NOT NULL, ts INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+        self.max_bytes = max_mb << 20
+        self.settings = repr(settings).encode()
+
+    def key(self, waveform):
+        """Hash the 16kHz PCM together with the settings that shape the transcript."""
+        pcm = memoryview(waveform.numpy()).cast("B")
+        if blake3 is not None:
+            digest = blake3(self.settings, max_threads=blake3.AUTO)
+        else:
+            digest = hashlib.sha256(self.settings)
+        digest.update(pcm)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached conversation for key, marking it recently used, or None."""
+        row = self.conn.execute(
+            "SELECT conversation FROM transcripts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE transcripts SET ts = ? WHERE key = ?", (time.time_ns(), key))
+        self.conn.commit()
+        return orjson.loads(row[0])
+
+    def put(self, key, conversation):
+        """Store a conversation, then evict least recently used entries beyond the size budget."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO transcripts (key, conversation, ts) VALUES (?, ?, ?)",
+            (key, orjson.dumps(conversation), time.time_ns()),
+        )
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(conversation)), 0) FROM transcripts"
+        ).fetchone()[0]
+        if total > self.max_bytes:
+            evict = []
+            for old_key, size in self.conn.execute(
+                "SELECT key, LENGTH(conversation) FROM transcripts WHERE key != ? ORDER BY ts ASC", (key,)
+            ):
+                if total <= self.max_bytes:
+                    break
+                evict.append((old_key,))
+                total -= size
+            self.conn.executemany("DELETE FROM transcripts WHERE key = ?", evict)
+        self.conn.commit()
+
+
+def open_cache(args):
+    """Open the transcript cache configured on the command line, or return None when caching is off."""
+    if not args.cache_dir:
+        return None
+    settings = (
+        args.backend,
+        args.whisper_model,
+        args.compute_type,
+        args.batch_size,
+        args.language,
+        "pyannote/speaker-diarization",
+    )
+    return TranscriptCache(args.cache_dir, args.cache_size_mb, settings)
+
+
+def transcribe_file(
+    filename, waveform, whisper_model, diarization_pipeline, batch_size=0, language=None, cache=None
+):
+    """Diarize and transcribe one decoded file, consulting the cache first. Returns its conversation."""
+    key = cache.key(waveform) if cache else None
+    if key:
+        conversation = cache.get(key)
+        if conversation is not None:
+            if SHOW_STATUS:
+                print(f"Using cached transcript for {filename}.")
+            return conversation
+
+    conversation = diarize_and_transcribe(
+        filename, waveform, whisper_model, diarization_pipeline, batch_size, language
+    )
+    if key:
+        cache.put(key, conversation)
+    return conversation
+
+
+def diarize_and_transcribe(filename, waveform, whisper_model, diarization_pipeline, batch_size=0, language=None):
+    """Diarize and transcribe one decoded file. Returns its speaker-labelled conversation."""
+    if batch_size and isinstance(whisper_model, whisper.Whisper):
+        speaker_segments = diarize_with_pyannote(filename, waveform, diarization_pipeline)
+
+        return transcribe_turns(
+            filename, waveform, speaker_segments, whisper_model, batch_size, language
+        )
+
+    # Whisper and Pyannote are independent here, so diarize on a second thread while
+    # transcribing; their CPU-side work overlaps and PyTorch releases the GIL in kernels.
+    # One combined spinner stands in for the two stage spinners, which would collide.
+    spinner = start_spinner(f"Transcribing and diarizing {filename}...")
+    try:
+        with ThreadPoolExecutor(max_workers=1) as diarizer:
+            diarization = diarizer.submit(
+                diarize_with_pyannote, filename, waveform, diarization_pipeline, False
+            )
+            transcript_segments = transcribe_with_whisper(
+                filename, waveform, whisper_model, batch_size, language, False
+            )
+            speaker_segments = diarization.result()
+        spinner.succeed("Transcription and diarization complete.")
+    except Exception as e:
+        spinner.fail(f"Transcription or diarization failed for {filename}.")
+        raise e
+
+    return align_transcription_with_diarization(transcript_segments, speaker_segments)
+
+
+def describe_failure(error):
+    """Classify a processing error as (kind, details), plain data that can cross a process boundary."""
+    if isinstance(error, subprocess.CalledProcessError):
+        return "ffmpeg-failed", str(error)
+    if isinstance(error, FileNotFoundError):
+        return "ffmpeg-missing", str(error)
+    return "other", str(error)
+
+
+def report_failure(filename, failure):
+    """Print why a file could not be processed, given a (kind, details) pair from describe_failure."""
+    kind, details = failure
+    if kind in ("ffmpeg-failed", "ffmpeg-missing"):
+        error_msg = "FFmpeg conversion failed." if kind == "ffmpeg-failed" else "FFmpeg not found."
+        print(f"Error: {error_msg} for {filename}. Check installation or path.")
+    elif kind == "model-load":
+        print(f"Error: Failed to load models in a worker process; skipped {filename}. Details: {details}")
+    elif kind == "worker-died":
+        print(f"Error: A worker process died while processing {filename}. Details: {details}")
+    else:
+        print(f"Error processing {filename}. Details: {details}")
+
+
+def process_files(
+    files,
+    whisper_model,
+    diarization_pipeline,
+    out_path_base,
+    batch_size=0,
+    language=None,
+    jsonl_path=None,
+    cache=None,
+):
+    """Process and transcribe a list of mp3/mp4/wav files, writing a Markdown output per file and optionally a JSONL record."""
     if not files:
         print("No media files found.")
         return
 
     md_output_dir = os.path.dirname(out_path_base) or "."
+    timestamp = datetime.now().astimezone().strftime("%B %d, %Y, %I:%M %p %Z")
     
-    with tempfile.TemporaryDirectory() as tmpdir:
-        for input_file in files:
-            print(f"\nProcessing file: {os.path.basename(input_file)}")
+    # ffmpeg runs on the CPU, so upcoming files are decoded while the GPU works on this one.
+    with open_jsonl(jsonl_path) as jsonl_f, ThreadPoolExecutor(max_workers=DECODE_AHEAD) as decoder:
+        pending = deque(decoder.submit(read_pcm, f) for f in files[:DECODE_AHEAD])
+        for index, input_file in enumerate(files):
+            decoding = pending.popleft()
+            if index + DECODE_AHEAD < len(files):
+                pending.append(decoder.submit(read_pcm, files[index + DECODE_AHEAD]))
+
+            filename = source_name(input_file)
+            print(f"\nProcessing file: {filename}")
             try:
-                
-                if Path(input_file).suffix.lower() in (".mp4", ".mp3"):
-                    audio_file = convert_to_wav(input_file, tmpdir)
-                else:
-                    audio_file = input_file 
-                    
-                transcript_segments = transcribe_with_whisper(audio_file, whisper_model)
-                
-                speaker_segments = diarize_with_pyannote(audio_file, diarization_pipeline)
-                
-                conversation = align_transcription_with_diarization(
-                    transcript_segments, speaker_segments
+                waveform = decode_audio(filename, decoding)
+
+                conversation = transcribe_file(
+                    filename, waveform, whisper_model, diarization_pipeline, batch_size, language, cache
                 )
 
-                record = {"file": os.path.basename(input_file), "conversation": conversation}
-                
-                write_single_markdown(record, md_output_dir)
-                
-                print(f"File processing complete: {os.path.basename(input_file)}")
+                record = {"file": filename, "conversation": conversation}
+            
+                write_single_markdown(record, timestamp, md_output_dir)
+                if jsonl_f:
+                    write_jsonl_record(jsonl_f, record)
+            
+                print(f"File processing complete: {filename}")
 
-            except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                error_msg = "FFmpeg conversion failed." if isinstance(e, subprocess.CalledProcessError) else "FFmpeg not found."
-                print(f"Error: {error_msg} for {os.path.basename(input_file)}. Check installation or path.")
             except Exception as e:
-                print(f"Error processing {os.path.basename(input_file)}. Details: {e}")
+                report_failure(filename, describe_failure(e))
+
+    print(f"\nProcess complete. All transcripts saved as individual Markdown files in {md_output_dir}.")
+
+
+_worker = {}
+
+
+def _init_worker(args, worker_count):
+    """Pool initializer: load this worker's models, spreading workers across the available GPUs."""
+    global SHOW_STATUS
+    SHOW_STATUS = False
+
+    with worker_count.get_lock():
+        worker_id = worker_count.value
+        worker_count.value += 1
+    if args.force_cpu:
+        device = "cpu"
+    elif DEVICE == "cuda":
+        device = f"cuda:{worker_id % torch.cuda.device_count()}"
+    else:
+        device = DEVICE
+
+    _worker["args"] = args
+    # An exception escaping the initializer breaks the whole pool, so a load failure
+    # is kept and reported for each file instead.
+    try:
+        _worker["whisper_model"] = load_whisper_model(
+            args.whisper_model, args.backend, args.compile, device, args.compute_type
+        )
+        _worker["diarization_pipeline"] = load_diarization_pipeline(args.pyannote_token, device)
+        _worker["cache"] = open_cache(args)
+    except Exception as e:
+        _worker["error"] = ("model-load", str(e))
+
+
+def _process_in_worker(input_file):
+    """Pool task: decode, diarize and transcribe one file. Returns (filename, conversation, failure).
+
+    failure is None or a (kind, details) pair; exceptions themselves are not sent back,
+    because one that cannot be unpickled in the parent would break the pool.
+    """
+    args = _worker["args"]
+    filename = source_name(input_file)
+    if "error" in _worker:
+        return filename, None, _worker["error"]
+    try:
+        waveform = read_pcm(input_file)
+        conversation = transcribe_file(
+            filename,
+            waveform,
+            _worker["whisper_model"],
+            _worker["diarization_pipeline"],
+            args.batch_size,
+            args.language,
+            _worker["cache"],
+        )
+        return filename, conversation, None
+    except Exception as e:
+        return filename, None, describe_failure(e)
+
+
+def process_files_parallel(files, args):
+    """Process files in a pool of worker processes, each holding its own models, writing Markdown as they finish."""
+    if not files:
+        print("No media files found.")
+        return
+
+    md_output_dir = os.path.dirname(args.out) or "."
+    timestamp = datetime.now().astimezone().strftime("%B %d, %Y, %I:%M %p %Z")
+
+    print(f"\nProcessing {len(files)} file(s) with {args.workers} workers...")
+    ctx = multiprocessing.get_context("spawn")
+    with open_jsonl(args.jsonl) as jsonl_f, ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(args, ctx.Value("i", 0)),
+    ) as pool:
+        futures = {pool.submit(_process_in_worker, f): source_name(f) for f in files}
+        for future in as_completed(futures):
+            # A worker killed mid-file (e.g. by the OOM killer) breaks the pool; the
+            # executor then fails every outstanding file instead of waiting forever.
+            try:
+                filename, conversation, failure = future.result()
+            except BrokenProcessPool as e:
+                report_failure(futures[future], ("worker-died", str(e)))
+                continue
+            if failure is not None:
+                report_failure(filename, failure)
+                continue
+            record = {"file": filename, "conversation": conversation}
+            write_single_markdown(record, timestamp, md_output_dir)
+            if jsonl_f:
+                write_jsonl_record(jsonl_f, record)
+            print(f"File processing complete: {filename}")
 
     print(f"\nProcess complete. All transcripts saved as individual Markdown files in {md_output_dir}.")
 
@@ -227,21 +889,87 @@ By BHIS
 
     parser = argparse.ArgumentParser(
         description=banner,
+        epilog="Environment:\n"
+               "  BLABBERFISH_QUIET=1  Disable progress spinners; status and error lines are still printed.",
         formatter_class=argparse.RawTextHelpFormatter
     )
-    parser.add_argument("--zip", help="Path to a ZIP file containing MP3/MP4s")
+    parser.add_argument("--zip", help="Path to a ZIP file containing MP3/MP4/WAVs")
     parser.add_argument("--mp3", help="Path to a single MP3 file")
     parser.add_argument("--mp4", help="Path to a single MP4 file")
+    parser.add_argument(
+        "--wav",
+        help="Path to a single WAV file. 16kHz mono 16-bit PCM is read directly without ffmpeg.",
+    )
     parser.add_argument(
         "--out", 
         default=".",
         help="Output directory for Markdown files. Default is current directory (.)."
     )
+    parser.add_argument(
+        "--jsonl",
+        help="Also write every transcript as one JSON record per line to this file.",
+    )
     parser.add_argument(
         "--whisper-model",
         default="base",
         help="Whisper model size (tiny, base, small, medium, large). Default: base.",
     )
+    parser.add_argument(
+        "--backend",
+        choices=("whisper", "faster-whisper", "transformers"),
+        default="whisper",
+        help="Whisper implementation. faster-whisper (CTranslate2) is several times faster\n"
+             "and filters silence with VAD. transformers runs Hugging Face Whisper in bf16 with\n"
+             "chunked batching and Flash Attention 2 when flash-attn is installed. Default: whisper.",
+    )
+    parser.add_argument(
+        "--language",
+        help="Spoken language code (e.g. en). Skips Whisper's language detection pass.\n"
+             "Default: detect automatically.",
+    )
+    parser.add_argument(
+        "--compute-type",
+        help="CTranslate2 compute type for --backend faster-whisper, e.g. float16 for\n"
+             "unquantized GPU inference. Default: int8_float16 on CUDA, int8 on CPU.",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile the Whisper encoder/decoder with torch.compile. Adds a one-off warm-up\n"
+             "when the model loads; worth it for long recordings or many files. whisper backend only.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Transcribe each speaker turn separately, decoding this many turns per Whisper batch.\n"
+             "With --backend faster-whisper, batch VAD chunks of the whole file instead.\n"
+             "With --backend transformers, batch 30 s chunks of the whole file (0 means 24).\n"
+             "Default: 0 (transcribe the whole file, then align it with the speaker turns).",
+    )
+    parser.add_argument(
+        "--force-cpu",
+        action="store_true",
+        help="Run Whisper and Pyannote on the CPU even when a CUDA GPU is available.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own models. Use the number of GPUs,\n"
+             "or 2 on a single GPU to overlap CPU-bound diarization steps. Default: 1.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache finished transcripts here, keyed by a hash of the decoded audio and the model\n"
+             "settings, so re-running on the same recordings skips Whisper and Pyannote.",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=512,
+        help="Size budget for --cache-dir; least recently used transcripts are evicted. Default: 512.",
+    )
     parser.add_argument(
         "--pyannote-token", 
         help="HuggingFace access token for pyannote models. Required."
@@ -249,12 +977,27 @@ By BHIS
 
     args = parser.parse_args()
 
-    if not args.zip and not args.mp3 and not args.mp4:
-        parser.error("Must provide one of: --zip, --mp3, or --mp4.")
+    if not args.zip and not args.mp3 and not args.mp4 and not args.wav:
+        parser.error("Must provide one of: --zip, --mp3, --mp4, or --wav.")
     
     if not args.pyannote_token:
         parser.error("Must provide --pyannote-token.")
 
+    if args.compile and args.backend != "whisper":
+        parser.error("--compile is only supported with --backend whisper.")
+
+    if args.compute_type and args.backend != "faster-whisper":
+        parser.error("--compute-type is only supported with --backend faster-whisper.")
+
+    if args.batch_size < 0:
+        parser.error("--batch-size must not be negative.")
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+
+    if args.cache_size_mb < 1:
+        parser.error("--cache-size-mb must be at least 1.")
+
     args.out = os.path.dirname(args.out) or "."
     
     return args
@@ -262,47 +1005,51 @@ By BHIS
 
 def main():
     args = parse_args()
-    
-    model_spinner = Halo(
-        text=f"Loading Whisper model: {args.whisper_model}...", 
-        spinner=SPINNER_TYPE, 
-        color=SPINNER_COLOR
-    ).start()
-    try:
-        whisper_model = whisper.load_model(args.whisper_model)
-        model_spinner.succeed(f"Whisper model loaded: {args.whisper_model}.")
-    except Exception as e:
-        model_spinner.fail(f"Failed to load Whisper model. Details: {e}")
-        return
 
-    diarization_spinner = Halo(
-        text="Loading Pyannote diarization pipeline...", 
-        spinner=SPINNER_TYPE, 
-        color=SPINNER_COLOR
-    ).start()
-    try:
-        diarization_pipeline = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization", use_auth_token=args.pyannote_token
+    if args.workers > 1:
+        # Each worker process loads its own models in process_files_parallel.
+        run = partial(process_files_parallel, args=args)
+    else:
+        device = "cpu" if args.force_cpu else DEVICE
+
+        model_spinner = start_spinner(f"Loading Whisper model: {args.whisper_model} ({args.backend})...")
+        try:
+            whisper_model = load_whisper_model(
+                args.whisper_model, args.backend, args.compile, device, args.compute_type
+            )
+            model_spinner.succeed(f"Whisper model loaded: {args.whisper_model} ({device}).")
+        except Exception as e:
+            model_spinner.fail(f"Failed to load Whisper model. Details: {e}")
+            return
+
+        diarization_spinner = start_spinner("Loading Pyannote diarization pipeline...")
+        try:
+            diarization_pipeline = load_diarization_pipeline(args.pyannote_token, device)
+            diarization_spinner.succeed("Pyannote pipeline loaded.")
+        except Exception as e:
+            diarization_spinner.fail(f"Failed to load Pyannote pipeline. Check token/network/permissions. Details: {e}")
+            return
+
+        run = partial(
+            process_files,
+            whisper_model=whisper_model,
+            diarization_pipeline=diarization_pipeline,
+            out_path_base=args.out,
+            batch_size=args.batch_size,
+            language=args.language,
+            jsonl_path=args.jsonl,
+            cache=open_cache(args),
         )
-        diarization_spinner.succeed("Pyannote pipeline loaded.")
-    except Exception as e:
-        diarization_spinner.fail(f"Failed to load Pyannote pipeline. Check token/network/permissions. Details: {e}")
-        return
 
     files = []
     if args.zip:
-        zip_spinner = Halo(
-            text=f"Extracting ZIP file {args.zip}...", 
-            spinner=SPINNER_TYPE, 
-            color=SPINNER_COLOR
-        ).start()
+        zip_spinner = start_spinner(f"Reading ZIP file {args.zip}...")
         
 
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                files = extract_zip(args.zip, tmpdir)
-                zip_spinner.succeed(f"Extracted {len(files)} media file(s).")
-                process_files(files, whisper_model, diarization_pipeline, args.out)
+            files = list_zip_media(args.zip)
+            zip_spinner.succeed(f"Found {len(files)} media file(s).")
+            run(files)
         except BadZipFile as e:
             zip_spinner.fail(str(e))
             return
@@ -312,11 +1059,15 @@ def main():
 
     elif args.mp3:
         files = [args.mp3]
-        process_files(files, whisper_model, diarization_pipeline, args.out)
+        run(files)
         
     elif args.mp4:
         files = [args.mp4]
-        process_files(files, whisper_model, diarization_pipeline, args.out)
+        run(files)
+
+    elif args.wav:
+        files = [args.wav]
+        run(files)
 
 
 if __name__ == "__main__":
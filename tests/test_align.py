@@ -0,0 +1,103 @@
+import copy
+import random
+
+import pytest
+
+import BlabberFish
+
+
+def reference_align(transcript_segments, speaker_segments):
+    """The original O(T*S) alignment loop, kept as the behaviour to match."""
+    aligned = []
+    for t in transcript_segments:
+        t_start, t_end, text = t["start"], t["end"], t["text"].strip()
+        best_speaker = None
+        best_overlap = 0.0
+
+        for s in speaker_segments:
+            overlap = max(0, min(t_end, s["end"]) - max(t_start, s["start"]))
+
+            if overlap > best_overlap:
+                best_overlap = overlap
+                best_speaker = s["speaker"]
+
+        aligned.append(
+            {
+                "speaker": best_speaker if best_speaker else "unknown",
+                "start": t_start,
+                "end": t_end,
+                "text": text,
+            }
+        )
+    return reference_merge(aligned)
+
+
+def reference_merge(segments):
+    """The original merge of consecutive segments by the same speaker."""
+    if not segments:
+        return []
+
+    merged = [segments[0]]
+    for seg in segments[1:]:
+        last = merged[-1]
+        if seg["speaker"] == last["speaker"]:
+            last["text"] += " " + seg["text"]
+            last["end"] = seg["end"]
+        else:
+            merged.append(seg)
+    return merged
+
+
+def random_case(rng, integer_times):
+    """Random transcript and (possibly overlapping) speaker segments; integer times produce many ties."""
+    def span(max_start, max_length):
+        if integer_times:
+            start = rng.randint(0, max_start)
+            return start, start + rng.randint(0, max_length)
+        start = rng.uniform(0, max_start)
+        return start, start + rng.uniform(0, max_length)
+
+    transcript = []
+    for i in range(rng.randint(0, 30)):
+        start, end = span(60, 8)
+        transcript.append({"start": start, "end": end, "text": f" line {i} "})
+    speakers = []
+    for _ in range(rng.randint(0, 20)):
+        start, end = span(60, 10)
+        speakers.append({"start": start, "end": end, "speaker": f"SPEAKER_0{rng.randint(0, 3)}"})
+    return transcript, speakers
+
+
+# A limit of 0 forces the sort-and-sweep; a huge one forces the NumPy overlap matrix.
+@pytest.mark.parametrize("matrix_limit", [0, 10**12], ids=["sweep", "vectorized"])
+@pytest.mark.parametrize("integer_times", [False, True], ids=["float", "tied"])
+def test_alignment_matches_original_loop(monkeypatch, matrix_limit, integer_times):
+    monkeypatch.setattr(BlabberFish, "ALIGN_MATRIX_LIMIT", matrix_limit)
+    rng = random.Random(1234)
+    for _ in range(500):
+        transcript, speakers = random_case(rng, integer_times)
+        expected = reference_align(copy.deepcopy(transcript), copy.deepcopy(speakers))
+        assert BlabberFish.align_transcription_with_diarization(transcript, speakers) == expected
+
+
+@pytest.mark.parametrize("matrix_limit", [0, 10**12], ids=["sweep", "vectorized"])
+def test_turn_ending_at_segment_start_does_not_overlap(monkeypatch, matrix_limit):
+    monkeypatch.setattr(BlabberFish, "ALIGN_MATRIX_LIMIT", matrix_limit)
+    transcript = [{"start": 5.0, "end": 8.0, "text": "hello"}]
+    speakers = [
+        {"start": 0.0, "end": 5.0, "speaker": "SPEAKER_00"},
+        {"start": 4.0, "end": 9.0, "speaker": "SPEAKER_01"},
+    ]
+    aligned = BlabberFish.align_transcription_with_diarization(transcript, speakers)
+    assert [seg["speaker"] for seg in aligned] == ["SPEAKER_01"]
+
+
+def test_merge_adjacent_segments_matches_original():
+    rng = random.Random(5678)
+    for _ in range(200):
+        segments = [
+            {"speaker": f"SPEAKER_0{rng.randint(0, 2)}", "start": i, "end": i + 1, "text": f"word{i}"}
+            for i in range(rng.randint(0, 25))
+        ]
+        expected = reference_merge(copy.deepcopy(segments))
+        assert BlabberFish.merge_adjacent_segments(segments) == expected